@@ -0,0 +1,111 @@
+import logging
+
+import psycopg2.pool
+
+from wukong.agentic.pgsql.pg_client import PostgreSQLClient
+
+
+def _client() -> PostgreSQLClient:
+    # the helpers under test do not touch the connection pool
+    return PostgreSQLClient.__new__(PostgreSQLClient)
+
+
+class TestSplitSqlStatements:
+    def test_splits_on_semicolons_outside_quotes_and_comments(self):
+        script = "select 'a;b', \"x;\" from t; -- c;\nselect $$ ; $$;"
+        assert _client()._split_sql_statements(script) == [
+            "select 'a;b', \"x;\" from t",
+            "select $$ ; $$",
+        ]
+
+    def test_unterminated_quotes_do_not_backtrack(self):
+        # nested quantifiers inside the quoted-string branches made these exponential
+        assert _client()._split_sql_statements("select 'abcdefghijklmnopqrstuvwxyz0123456789") == [
+            "select 'abcdefghijklmnopqrstuvwxyz0123456789"
+        ]
+        assert _client()._split_sql_statements('select "abcdefghijklmnopqrstuvwxyz0123456789; select 1') == [
+            'select "abcdefghijklmnopqrstuvwxyz0123456789',
+            "select 1",
+        ]
+
+
+class TestFirstKeyword:
+    def test_skips_whitespace_and_comments(self):
+        assert PostgreSQLClient._first_keyword("  -- note\n /* block */ select 1") == "SELECT"
+
+    def test_leading_whitespace_without_keyword_does_not_backtrack(self):
+        # a \s+ run inside the repeated group made this exponential in the whitespace length
+        assert PostgreSQLClient._first_keyword(" " * 64 + "(") == ""
+
+
+class _FakeCursor:
+    def __init__(self):
+        self.rowcount = -1
+        self.statements = []
+
+    def execute(self, query, params=None):
+        # a batch of statements joined into one execute only reports the last one
+        self.statements.append(query)
+        self.rowcount = 1
+
+    def executemany(self, query, params_list):
+        # psycopg2 sums the rowcount of every execution
+        self.statements.extend(query for _ in params_list)
+        self.rowcount = len(params_list)
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.cursor_obj = _FakeCursor()
+        self.committed = False
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+class TestExecuteMany:
+    def test_update_counts_every_row(self, monkeypatch):
+        client = _client()
+        client.logger = logging.getLogger(__name__)
+        connection = _FakeConnection()
+        monkeypatch.setattr(client, "get_connection", lambda: connection)
+        monkeypatch.setattr(client, "release_connection", lambda conn: None)
+
+        params = [(idx,) for idx in range(5)]
+        assert client.execute_many("UPDATE t SET flag = true WHERE id = %s", params, page_size=2) == 5
+        assert connection.committed
+
+
+class _FakePool:
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+
+    def closeall(self):
+        self.closed = True
+
+
+class TestCloseAllConnections:
+    def test_shared_pool_closes_with_its_last_client(self, monkeypatch):
+        monkeypatch.setattr(psycopg2.pool, "ThreadedConnectionPool", _FakePool)
+        params = dict(host="localhost", database="wk_test_shared_pool", user="wk", password="wk")
+        first = PostgreSQLClient(**params)
+        second = PostgreSQLClient(**params)
+        pool = first.connection_pool
+        assert second.connection_pool is pool
+
+        first.close_all_connections()
+        first.close_all_connections()
+        assert not pool.closed
+        assert second.connection_pool is pool
+
+        second.close_all_connections()
+        assert pool.closed
@@ -0,0 +1,24 @@
+import pytest
+
+from wukong.agentic.pgsql.pg_prompts import (
+    COLUMN_DESCRIPTION_SYSTEM_PROMPT,
+    COLUMN_DESCRIPTION_USER_PROMPT,
+)
+
+
+class TestColumnDescriptionPrompt:
+    def test_system_prompt_is_constant(self):
+        # sent verbatim as the shared prefix, so it must not carry per-chunk fields
+        assert COLUMN_DESCRIPTION_SYSTEM_PROMPT.startswith(
+            "You are an expert data analyst. Your task is to infer and describe database column semantics"
+        )
+        assert "{columns_info}" not in COLUMN_DESCRIPTION_SYSTEM_PROMPT
+        assert "{{" not in COLUMN_DESCRIPTION_SYSTEM_PROMPT
+
+    def test_user_prompt_takes_only_columns_info(self):
+        columns_info = "- Column Name: status\n - Data Type: text\n - Sample Values: [\"A\"]\n"
+        assert COLUMN_DESCRIPTION_USER_PROMPT.format(columns_info=columns_info) == f"Given:\n{columns_info}\n"
+
+    def test_user_prompt_has_no_column_name_field(self):
+        with pytest.raises(KeyError):
+            COLUMN_DESCRIPTION_USER_PROMPT.format(column_name="status")
@@ -0,0 +1,60 @@
+import os
+
+from wukong.agentic.pgsql.prompt_builder import SQLPromptBuilder
+
+
+SCHEMA = "## Table: public.orders\n- id integer\n- status text"
+
+
+class TestSQLPromptBuilder:
+    def test_initial_prompt(self):
+        prompt = SQLPromptBuilder(SCHEMA).build_initial_prompt("count orders")
+        assert prompt.startswith(
+            f"You are an expert SQL query generator for PostgreSQL databases.\n\n{SCHEMA}\n\nIMPORTANT INSTRUCTIONS:\n"
+        )
+        assert prompt.endswith("\n\nUSER QUERY: count orders\n\nGenerate the SQL query:")
+
+    def test_fix_prompt(self):
+        prompt = SQLPromptBuilder(SCHEMA).build_fix_prompt("count orders", "select count(*) from order", "relation \"order\" does not exist", 2)
+        assert prompt.startswith(
+            f"The previous SQL query failed to execute. Please fix it.\n\n{SCHEMA}\n\n"
+            "ORIGINAL USER QUERY: count orders\n\n"
+            "FAILED SQL QUERY:\nselect count(*) from order\n\n"
+            "ERROR MESSAGE:\nrelation \"order\" does not exist\n\n"
+            "ATTEMPT: 2\n\n"
+            "INSTRUCTIONS:\n1. Analyze the error message carefully\n"
+        )
+        assert prompt.endswith("6. Do not include semicolons at the end\n\nGenerate the corrected SQL query:")
+
+    def test_schema_file_reloaded_only_when_changed(self, tmp_path):
+        schema_file = tmp_path / "schema.md"
+        schema_file.write_text("first schema")
+        builder = SQLPromptBuilder(schema_file, schema_reload=True)
+        assert "\nfirst schema\n" in builder.build_initial_prompt("q")
+
+        schema_file.write_text("second schema!")
+        os.utime(schema_file, ns=(1, 1))
+        assert "\nsecond schema!\n" in builder.build_fix_prompt("q", "select 1", "error", 1)
+
+    def test_schema_file_not_reloaded_without_reload(self, tmp_path):
+        schema_file = tmp_path / "schema.md"
+        schema_file.write_text("first schema")
+        builder = SQLPromptBuilder(schema_file)
+        schema_file.write_text("second schema!")
+        assert "\nfirst schema\n" in builder.build_initial_prompt("q")
+
+    def test_initial_prompt_reused_until_schema_changes(self):
+        schema = "first schema"
+        builder = SQLPromptBuilder(lambda: schema)
+        prompt = builder.build_initial_prompt("count orders")
+        assert builder.build_initial_prompt("count orders") is prompt
+
+        schema = "second schema"
+        changed = builder.build_initial_prompt("count orders")
+        assert changed is not prompt
+        assert "\nsecond schema\n" in changed
+
+    def test_callable_schema_provider(self):
+        schemas = iter(["first schema", "second schema"])
+        builder = SQLPromptBuilder(lambda: next(schemas))
+        assert "\nsecond schema\n" in builder.build_initial_prompt("q")
@@ -0,0 +1,32 @@
+import pytest
+
+from wukong.agentic.pgsql.supervisor_agent import SupervisorAgent
+
+
+class TestQuickRoute:
+    @pytest.mark.parametrize("question", [
+        "select * from users",
+        "SELECT id, name FROM public.users WHERE active;",
+        "select count(*) from orders group by status",
+        "select distinct status from orders order by 1",
+        "with recent as (select * from orders) select * from recent",
+        "explain select o.id from orders as o join users as u on u.id = o.user_id",
+    ])
+    def test_sql_statements_skip_the_llm(self, question):
+        assert SupervisorAgent.quick_route(question) == "SQL_QUERY"
+
+    @pytest.mark.parametrize("question", [
+        "explain what a foreign key is",
+        "how many planets are there",
+        "what is the number of days in a leap year",
+        "list all the SQL join types",
+        "with that in mind, what should I do next?",
+        "select the best index type for me",
+        "select one from the menu",
+        "top 10 tips for writing SQL",
+    ])
+    def test_phrasing_is_left_to_the_llm(self, question):
+        assert SupervisorAgent.quick_route(question) is None
+
+    def test_small_talk_is_general_info(self):
+        assert SupervisorAgent.quick_route("thanks!") == "GENERAL_INFO"
@@ -1,15 +1,19 @@
+import hashlib
 import json
+import os
 import pathlib
-from typing import List
+import tempfile
+from typing import Dict, List, Tuple
 import click
 from rich.console import Console
 from .pg_client import PostgreSQLClient
 from ...wukong_config import wukong_config
-from wukong.llm.llm_client import LLMClient
 
-PG_CLIENT_PARAMS = [
+PG_CLIENT_PARAMS = frozenset({
     "database_url", "host", "port", "database", "user", "password", "max_conn"
-]
+})
+
+SCHEMA_CACHE_DIR = pathlib.Path.home() / ".wukong" / "schema_cache"
 
 @click.group()
 def pg_sql():
@@ -21,39 +25,85 @@ def get_pg_config(section: str) -> dict:
     dbprop = wukong_config.get(section)
     if not dbprop:
         raise ValueError(f"{section} is not configured in .wukong.toml")
-    pgprops = {k: v for k, v in dbprop.items() if k in PG_CLIENT_PARAMS}
+    pgprops = {k: dbprop[k] for k in dbprop.keys() & PG_CLIENT_PARAMS}
     if 'url' in dbprop:
         database_url = dbprop['url']        
         pgprops["database_url"] = database_url
     return pgprops
 
 
-def get_llm_client(self) -> LLMClient:
-    llm_config = wukong_config.get("llm", {})     
-    base_url = llm_config.get("base_url", None)
-    api_key = llm_config.get("api_key", None)
-    models = llm_config.get("model_id", {})  
-    assert models is not None, "model_id must be specified in [llm] section of .wukong.toml"     
-    model_id = models[0] if isinstance(models, list) else models    
-    max_completion_tokens = llm_config.get("max_completion_tokens", 3200) 
-    fallback_models = llm_config.get("fallback_models", [])                 
-    llm_client = LLMClient(
-        model_id=model_id,
-        base_url=base_url,
-        api_key=api_key,
-        max_completion_tokens=max_completion_tokens,
-        fallback_models=fallback_models, 
-        streaming_handler=None
-    )
-    return llm_client
+def _write_cache_file(cache_file: pathlib.Path, content: str):
+    """
+    Write a cache file atomically: the content goes to a temporary file in the same directory
+    which then replaces the cache file, so readers never see a partially written entry.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=f".{cache_file.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fout:
+            fout.write(content)
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _cached_table_schemas(dbclient: PostgreSQLClient, tables: List[str], enhance: bool, use_cache: bool = True) -> Dict[str, Tuple[str, list]]:
+    """
+    Retrieve table schemas in one batch, reusing the on-disk cache for tables whose columns are unchanged.
+
+    The cache key is the sha256 of the database DSN, schema, table, column-list
+    fingerprint and enhance flag, so any column change invalidates the entry.
 
+    Returns:
+        Dictionary of table name -> (schema string, example user queries); missing tables are omitted
+    """
+    if not use_cache:
+        return dbclient.get_table_schemas(tables, enhance)
+
+    columns = dbclient.get_tables_columns(tables)
+
+    schemas = {}
+    cache_files = {}
+    for table in tables:
+        schema, table_name = table.split('.', 1) if '.' in table else ("public", table)
+        table_columns = columns.get(f"{schema}.{table_name}".lower())
+        if not table_columns:
+            continue
+        key = hashlib.sha256(json.dumps({
+            "dsn": dbclient.get_dsn(),
+            "schema": schema.lower(),
+            "table": table_name.lower(),
+            "enhance": enhance,
+            "cols_fp": PostgreSQLClient.fingerprint_columns(table_columns),
+        }, sort_keys=True).encode("utf-8")).hexdigest()
+        cache_file = SCHEMA_CACHE_DIR / f"{key}.json"
+        cache_files[table] = cache_file
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            schemas[table] = (cached["schema"], cached.get("user_queries", []))
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing or unreadable (e.g. corrupt) entries are cache misses and get regenerated
+            pass
+
+    misses = [table for table in cache_files if table not in schemas]
+    if misses:
+        incomplete = set()
+        generated = dbclient.get_table_schemas(misses, enhance, incomplete=incomplete)
+        SCHEMA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for table, (db_schema, queries) in generated.items():
+            # a schema the LLM failed to describe is used for this run only and regenerated next time
+            if table not in incomplete:
+                _write_cache_file(cache_files[table], json.dumps({"schema": db_schema, "user_queries": queries}))
+            schemas[table] = (db_schema, queries)
+    return schemas
 
 
 @click.command()
 @click.option("--database", "-d", type=str, default="database", help="database configuration section name in .wukong.toml") 
 @click.option("--sql-file", "-s", type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path), default=None, help="Path to SQL script file")     
 @click.option("--sql-string", "-q", type=str, default=None, help="SQL script string")     
-def execute_sql(database: str, sql_file:pathlib.Path=None, sql_string:str=None):
+@click.option("--batch", "-b", is_flag=True, type=bool, default=False, help="Send the whole script in one round-trip and transaction, without per-statement results")
+def execute_sql(database: str, sql_file:pathlib.Path=None, sql_string:str=None, batch:bool=False):
     """simple postgresql client, execute DML and DDL statements"""
     console = Console()    
     dbprop = get_pg_config(database)    
@@ -61,11 +111,14 @@ def execute_sql(database: str, sql_file:pathlib.Path=None, sql_string:str=None):
         
         if sql_file is not None:
             console.print(f"[yellow]Excuting SQL File[/yellow] {sql_file}")
-            dbclient.execute_sql_file(sql_file.resolve())
+            dbclient.execute_sql_file(sql_file.resolve(), batch=batch)
         
         if sql_string is not None:
             console.print(f"[yellow]Excuting SQL query[/yellow]")
-            dbclient.execute_sql_script(sql_string)
+            if batch:
+                dbclient.execute_sql_batch(sql_string)
+            else:
+                dbclient.execute_sql_script(sql_string)
 
 
 @click.command()
@@ -74,14 +127,16 @@ def execute_sql(database: str, sql_file:pathlib.Path=None, sql_string:str=None):
 @click.option("--enhance", "-e",  is_flag=True, type=bool, default=False, help="Enhance schema with column descriptions using LLM")
 @click.option("--schema", "-s",  type=str, help="Schema Name", default=None)
 @click.option("--exclude-flag", "-x",  is_flag=True, type=bool, default=False, help="Exclude flag indices from table names the schema extraction")
+@click.option("--no-cache", is_flag=True, type=bool, default=False, help="Ignore cached table schemas and regenerate them")
 @click.argument("tables",  type=str, nargs=-1)
-def text_to_sql_schema(database: str, schema_file:pathlib.Path, tables:List[str], schema:str, enhance:bool, exclude_flag:bool):
+def text_to_sql_schema(database: str, schema_file:pathlib.Path, tables:List[str], schema:str, enhance:bool, exclude_flag:bool, no_cache:bool):
     """generate LLM table schema for text to SQL"""
     assert tables or schema is not None, "Either tables or schema must be specified"
     console = Console()
+    from wukong.llm.utils import llm_client_for
     dbprop = get_pg_config(database)   
     with PostgreSQLClient(**dbprop) as dbclient: 
-        dbclient.llm_client = get_llm_client(dbclient)       
+        _, dbclient.llm_client = llm_client_for("llm")       
         schemas = []
         if exclude_flag is True and schema is not None and tables:
             input_tables = set([tb.lower() if "." in tb else f"public.{tb}".lower() for tb in tables])
@@ -94,8 +149,9 @@ def text_to_sql_schema(database: str, schema_file:pathlib.Path, tables:List[str]
             return
         
         example_queries = []
+        table_schemas = _cached_table_schemas(dbclient, tables, enhance, use_cache=not no_cache)
         for table in tables:
-            db_schema, queries  = dbclient.get_table_schema(table, enhance)
+            db_schema, queries = table_schemas.get(table, (None, []))
             if db_schema is None:
                 console.print(f"[yellow]No such table {table}[/yellow]")
             else:
@@ -124,11 +180,12 @@ def text_to_sql_schema(database: str, schema_file:pathlib.Path, tables:List[str]
 def describe_columns(database: str, schema:str, table:str, columns:bool):
     """enahnce column metadata with descriptions using LLM for text to SQL"""    
     console = Console()
+    from wukong.llm.utils import llm_client_for
     dbprop = get_pg_config(database)   
     with PostgreSQLClient(**dbprop) as dbclient:        
-        dbclient.llm_client = get_llm_client(dbclient)
-        cols =dbclient.get_columns_data_type(schema, table, list(columns))
-        descriptions = dbclient.get_column_descriptions(schema, table, cols)
+        _, dbclient.llm_client = llm_client_for("llm")
+        described = dbclient.describe_columns(schema, table, list(columns))
+        descriptions = list(dict.fromkeys(col["description"] for col in described if col["description"]))
         if not descriptions:
             console.print(f"[yellow]No descriptions found for {table}({', '.join(columns)})[/yellow]")
             return
@@ -3,9 +3,9 @@ import logging
 import os
 import json
 import pathlib
-import re
 from typing import Callable, TypedDict, Annotated, List, Optional, Union
 from functools import partial
+from itertools import chain
 from copy import deepcopy
 from datetime import date, datetime
 from pathlib import Path
@@ -14,157 +14,188 @@ import click
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 from prompt_toolkit import PromptSession
 from prompt_toolkit import HTML
 from prompt_toolkit import prompt as terminal_prompt
 from prompt_toolkit.history import FileHistory
+from prompt_toolkit.key_binding import KeyBindings
 
-from .supervisor_agent import SupervisorAgent
-from .text_to_sql_agent import TextToSQLAgent
 from .pg_client import PostgreSQLClient
+from .commands import get_pg_config
 from wukong.llm.history_manager import LLMHistoryManager
-from wukong.llm.llm_client import LLMClient
+from wukong.llm.think_filter import ThinkTagFilter
 from ...wukong_config import wukong_config, WukongConfigManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+
+# number of result rows kept in chat history for follow-up questions
+HISTORY_PREVIEW_ROWS = 20
+
+_WELCOME_TEXT = """Welcome to the interactive Wukong shell!
+### Commands:
+- Type your prompt and press Enter twice to submit
+- Type 'exit' or 'quit' or 'bye' to leave
+- Type 'clear' to clear CLI console screen
+- Type 'clear history', 'save history', 'show history' to view, save and clear hsitory
+- Press Ctrl+C to cancel current input
+
+### Multi-line Input:
+Enter your prompt. Press Enter twice (empty line) to submit.
+        """
+_WELCOME = Markdown(_WELCOME_TEXT)
+_PROMPT_FIRST = HTML("<ansiyellow>[You]&gt;&gt;&gt; </ansiyellow>")
+_PROMPT_CONT = HTML("<ansiyellow>... </ansiyellow>")
+
+_MULTILINE_BINDINGS = KeyBindings()
+
+
+@_MULTILINE_BINDINGS.add("enter")
+def _submit_on_empty_line(event):
+    """Enter on an empty line submits the prompt, otherwise starts a new line"""
+    buffer = event.current_buffer
+    if buffer.document.current_line == "" and buffer.text.endswith("\n"):
+        buffer.validate_and_handle()
+    else:
+        buffer.insert_text("\n")
+
+# resolved once per process, FileHistory creates the file on first write
+_PROMPT_HISTORY_FILE: Optional[Path] = None
         
 
          
 
 class PgAgentShell:
     def __init__(self, schema_context:Union[Path, str], dbclient:PostgreSQLClient, config:WukongConfigManager = None, reload:bool=False):   
+        # agents pull in the LLM client stack, import them only when a shell is started
+        from .supervisor_agent import SupervisorAgent
+        from .text_to_sql_agent import TextToSQLAgent
+        from wukong.llm.utils import llm_client_for
         self.reload = reload  
         self.prompt_history = FileHistory(self._get_prompt_history_file())
         self.prompt_session = PromptSession(history=self.prompt_history)
         self.schema_context = schema_context        
+        self.dbclient = dbclient
+        self._schema_text = None
+        self._schema_key = None
         self.config = config if config is not None else wukong_config  
         self.console = Console()
         self.chat_history = LLMHistoryManager()
-        model_id = self.config.get("text_to_sql.model_id", None)
-        assert model_id is not None, "model_id must be specified in [text_to_sql] section of .wukong.toml"
+        model_id, self.llm_client = llm_client_for("text_to_sql", self.chat_history, self.config)
          # initialize TextToSQLAgent        
-        self.llm_client = self._get_llm_client()        
         self.text_to_sql_agent = TextToSQLAgent(
-            database_schema = self.schema_context,
+            database_schema = self._load_schema,
             model_id = model_id,
             dbclient = dbclient,
             llm_client = self.llm_client,
             reload_schema = self.reload,
-            chat_history_manager = self.chat_history
+            chat_history_manager = self.chat_history,
+            max_rows = self.config.get("text_to_sql.max_rows", None)
         )
         print(f"Using model {model_id} for text to SQL")
-        self.supervisor = SupervisorAgent(self.schema_context, model_id, self.llm_client, self.chat_history)
-               
-    
-    def _get_llm_client(self) -> LLMClient:
-        llm_config = self.config.get("llm", {})     
-        base_url = llm_config.get("base_url", None)
-        api_key = llm_config.get("api_key", None)
-        llm_config = self.config.get("text_to_sql", {})  
-           
-        model_id = llm_config.get("model_id", None)    
-        assert model_id is not None, "model_id must be specified in [text_to_sql] section of .wukong.toml"
-        max_completion_tokens = llm_config.get("max_completion_tokens", None) 
-        fallback_models = llm_config.get("fallback_models", [])
-        history_limit = llm_config.get("history_limit", 100)               
-        llm_client = LLMClient(
-            model_id=model_id,
-            base_url=base_url,
-            api_key=api_key,
-            max_completion_tokens=max_completion_tokens,
-            fallback_models=fallback_models,
-            history_manager=self.chat_history,
-            history_limit=history_limit,
-            streaming_handler=None
-        )
-        return llm_client
+        self.supervisor = SupervisorAgent(self._load_schema, model_id, self.llm_client, self.chat_history)
     
+    def _load_schema(self) -> str:
+        """Return the schema context, re-reading the file only when reload is set and its mtime or size changed"""
+        if not isinstance(self.schema_context, Path):
+            return self.schema_context
+        if self._schema_text is not None and not self.reload:
+            return self._schema_text
+        stat = self.schema_context.stat()
+        schema_key = (stat.st_mtime_ns, stat.st_size)
+        if schema_key != self._schema_key:
+            if self._schema_key is not None:
+                # the schema file changed, so the database schema may have too
+                self.dbclient.invalidate_schema_cache()
+            self._schema_text = self.schema_context.read_text()
+            self._schema_key = schema_key
+        return self._schema_text
+               
     
     def _get_prompt_history_file(self) -> Path:
-        wukong_hist = Path.home() / ".wukong/.wukong_prompt_history"
-        if wukong_hist.exists() is False:
+        global _PROMPT_HISTORY_FILE
+        if _PROMPT_HISTORY_FILE is None:
+            wukong_hist = Path.home() / ".wukong/.wukong_prompt_history"
             wukong_hist.parent.mkdir(exist_ok=True)
-            wukong_hist.write_text("")            
-        return wukong_hist.resolve()
+            _PROMPT_HISTORY_FILE = wukong_hist
+        return _PROMPT_HISTORY_FILE
     
     def display_welcome(self):
         """Display welcome message and instructions"""
-        welcome_text = """Welcome to the interactive Wukong shell!
-### Commands:
-- Type your prompt and press Enter twice to submit
-- Type 'exit' or 'quit' or 'bye' to leave
-- Type 'clear' to clear CLI console screen
-- Type 'clear history', 'save history', 'show history' to view, save and clear hsitory
-- Press Ctrl+C to cancel current input
-
-### Multi-line Input:
-Enter your prompt. Press Enter twice (empty line) to submit.
-        """
-        self.console.print(Markdown(welcome_text))
+        self.console.print(_WELCOME)
         
     def get_multiline_input(self) -> Optional[str]:
         """Get multi-line input from user"""
         self.console.print("\n[bold cyan]Enter your prompt (double Enter to submit):[/bold cyan]")
-        lines = []
-        
         try:
-            line_pos = 0
-            while True:
-                line_pos += 1
-                if line_pos ==1:                    
-                    line = self.prompt_session.prompt(HTML("<ansiyellow>[You]&gt;&gt;&gt; </ansiyellow>"))
-                else:
-                    line = self.prompt_session.prompt(HTML("<ansiyellow>... </ansiyellow>"))
-                
-                if len(lines)==1 and lines[0].strip() in ["quit", "exit", "bye", "\\q"] and line == "":
-                    break                
-                elif line == "" and lines and lines[-1] == "":
-                    lines.pop()  # Remove the last empty line
-                    break
-                lines.append(line)                
-                
+            text = self.prompt_session.prompt(
+                _PROMPT_FIRST,
+                multiline=True,
+                key_bindings=_MULTILINE_BINDINGS,
+                prompt_continuation=_PROMPT_CONT
+            )
         except KeyboardInterrupt:
             self.console.print("\n[yellow]Input cancelled[/yellow]")
             return None
             
-        prompt = "\n".join(lines).strip()
+        prompt = text.strip()
         return prompt if prompt else None
     
     
     def _show_history(self):
-        hists = self.llm.chat_history.get_chat_history(40)
-        for hist in hists:
-            if hist.get("role") == "user":
-                self.console.print(hist.get("content"))
+        hists = self.chat_history.get_chat_history(40)
+        msgs = [hist.get("content") for hist in hists if hist.get("role") == "user"]
+        if msgs:
+            self.console.print("\n---\n".join(msgs))
     
     
+    def _exit(self) -> bool:
+        self.console.print("[bold red]Goodbye![/bold red]")
+        return False
+    
+    def _clear_screen(self) -> bool:
+        os.system('clear' if os.name == 'posix' else 'cls')
+        self.display_welcome()
+        return True
+    
+    def _clear_history(self) -> bool:
+        self.chat_history.clear_history()
+        return True
+    
+    def _save_history(self) -> bool:
+        self.chat_history.save_history()
+        return True
+    
+    def _show_history_command(self) -> bool:
+        self._show_history()
+        return True
+    
+    # normalized command -> handler method name
+    COMMANDS = {
+        "exit": "_exit",
+        "quit": "_exit",
+        "q": "_exit",
+        "bye": "_exit",
+        "clear": "_clear_screen",
+        "clear history": "_clear_history",
+        "clearhistory": "_clear_history",
+        "new": "_clear_history",
+        "new chat": "_clear_history",
+        "newchat": "_clear_history",
+        "save history": "_save_history",
+        "savehistory": "_save_history",
+        "show history": "_show_history_command",
+        "showhistory": "_show_history_command",
+    }
+    
     def process_command(self, command: str) -> bool:
         """Process special commands"""
-        command_lower = command.lower().strip()
-        
-        if command_lower in ['exit', 'quit', 'q', "bye"]:
-            self.console.print("[bold red]Goodbye![/bold red]")
-            return False
-            
-        if command_lower == 'clear':            
-            os.system('clear' if os.name == 'posix' else 'cls')
-            self.display_welcome()
-            return True        
-        
-        if re.search(r'^clear\s*history$', command_lower) or re.search(r'new(\s*chat)?$', command_lower):
-            self.llm.chat_history.clear_history()            
-            return True
-        
-        if re.search(r'^save\s*history$', command_lower):
-            self.llm.chat_history.save_history()            
-            return True
-        
-        if re.search(r'^show\s*history$', command_lower):
-            self._show_history() 
-            return True
-                    
-        return None    
+        command_lower = " ".join(command.lower().split())
+        handler = self.COMMANDS.get(command_lower)
+        if handler is None:
+            return None
+        return getattr(self, handler)()
     
     @staticmethod   
     def dict_list_to_markdown_table(data):
@@ -181,7 +212,7 @@ Enter your prompt. Press Enter twice (empty line) to submit.
             return "No data available"
         
         # Get headers from the first dictionary
-        headers = list(data[0].keys())
+        headers = tuple(data[0].keys())
         
         # Create header row
         header_row = "| " + " | ".join(str(h) for h in headers) + " |"
@@ -189,16 +220,35 @@ Enter your prompt. Press Enter twice (empty line) to submit.
         # Create separator row
         separator_row = "| " + " | ".join("---" for _ in headers) + " |"
         
-        # Create data rows
-        data_rows = []
-        for item in data:
-            row = "| " + " | ".join(str(item.get(h, "")) for h in headers) + " |"
-            data_rows.append(row)
+        # Create data rows lazily, most values are already str after adapter conversion
+        def _row(item):
+            values = (item.get(h, "") for h in headers)
+            return "| " + " | ".join(v if type(v) is str else str(v) for v in values) + " |"
         
         # Combine all rows
-        markdown_table = "\n".join([header_row, separator_row] + data_rows)
+        markdown_table = "\n".join(chain((header_row, separator_row), map(_row, data)))
         
         return markdown_table    
+    
+    @staticmethod
+    def dict_list_to_table(data) -> Union[Table, str]:
+        """
+        Convert a list of dictionaries to a Rich table, adding rows as they are iterated.
+        
+        Args:
+            data (list): List of dictionaries with consistent keys
+            
+        Returns:
+            Table: Rich table, or a message string if there is no data
+        """
+        if not data:
+            return "No data available"
+        
+        headers = list(data[0].keys())
+        table = Table(*[str(h) for h in headers], show_header=True, header_style="bold magenta")
+        for item in data:
+            table.add_row(*[str(item.get(h, "")) for h in headers])
+        return table
         
     def run(self):
             """Main loop for the interactive shell"""
@@ -229,22 +279,30 @@ Enter your prompt. Press Enter twice (empty line) to submit.
                         else:
                             
                             if response.get("success"):
-                                resp_str = self.dict_list_to_markdown_table(response.get("data", []))
+                                data = response.get("data", [])
+                                resp_str = self.dict_list_to_markdown_table(data[:HISTORY_PREVIEW_ROWS])
+                                if len(data) > HISTORY_PREVIEW_ROWS:
+                                    # tell follow-up turns the table is only a preview of the result
+                                    resp_str += f"\n\n(showing {HISTORY_PREVIEW_ROWS} of {len(data)} rows)"
                                 self.chat_history.add_user_message(user_input)
                                 self.chat_history.add_assistant_message(resp_str)
-                                self.console.print(Panel(Markdown(resp_str), title="Query Result", subtitle=f"Rows: {response.get('row_count', 0)}"))
+                                subtitle = f"Rows: {response.get('row_count', 0)}"
+                                if response.get("truncated"):
+                                    subtitle += " (truncated, text_to_sql.max_rows reached)"
+                                self.console.print(Panel(self.dict_list_to_table(data), title="Query Result", subtitle=subtitle))
                             else: 
                                 resp_str = response.get("error", "Unknown error") 
                                 self.chat_history.add_user_message(user_input)
                                 self.chat_history.add_assistant_message(resp_str)                                       
                                 self.console.print(Panel(Markdown(resp_str), title="Error Response"))
                     else:
-                        response_text = ""
-                        for chunk in self.llm_client.invoke_model_stream(prompt=user_input):
-                            print(chunk, end='', flush=True)
-                            response_text += chunk
+                        think_filter = ThinkTagFilter()
+                        self.llm_client.invoke_model_stream(
+                            prompt=user_input,
+                            streaming_handler=lambda chunk: print(think_filter.feed(chunk), end='', flush=True)
+                        )
                         print("\n")
-                        response_text = response_text.split("</think>")[-1].strip()
+                        response_text = think_filter.text()
                         self.chat_history.add_user_message(user_input)
                         self.chat_history.add_assistant_message(response_text)                       
                         self.console.print(Panel(Markdown(response_text), title="General Chat Response"))
@@ -256,20 +314,6 @@ Enter your prompt. Press Enter twice (empty line) to submit.
                     logger.exception("An error occurred", e)
                     self.console.print(f"[red]Error: {str(e)}[/red]")
 
-PG_CLIENT_PARAMS = [
-    "database_url", "host", "port", "database", "user", "password", "max_conn"
-]
-
-def get_pg_config(section: str) -> dict:    
-    dbprop = wukong_config.get(section)
-    if not dbprop:
-        raise ValueError(f"{section} is not configured in .wukong.toml")
-    pgprops = {k: v for k, v in dbprop.items() if k in PG_CLIENT_PARAMS}
-    if 'url' in dbprop:
-        database_url = dbprop['url']        
-        pgprops["database_url"] = database_url
-    return pgprops
-
 @click.command
 @click.option("--database", "-d", type=str, default="database", help="database configuration section name in .kara_code.env.toml") 
 @click.option("--schema-file", "-s", type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path), help="Path to schema file for text to SQL", required=True)  
@@ -1,4 +1,5 @@
-PROMPT_TEMPLATE = """You are an expert SQL query generator. Your task is to convert natural language questions into accurate SQL queries based on the provided database schema.
+# instructions shared by the text to SQL prompts
+_SQL_GEN_INSTRUCTIONS = """You are an expert SQL query generator. Your task is to convert natural language questions into accurate SQL queries based on the provided database schema.
 
 ## Database Schema Information
 
@@ -138,6 +139,11 @@ Before finalizing your query, verify:
 
 """
 
+PROMPT_TEMPLATE = _SQL_GEN_INSTRUCTIONS
+
+TEXT_TO_SQL = _SQL_GEN_INSTRUCTIONS + """[Insert your specific database schema, column metadata, and value format documentation here]
+"""
+
 TABLE_DESCRIPTION_PROMPT = """You are an expert data analyst. Your task is to infer and describe database table semantics based on table name, column name and sample data values. 
 
 ### Given:
@@ -175,152 +181,11 @@ TABLE_DESCRIPTION_PROMPT = """You are an expert data analyst. Your task is to in
 
 """
 
-TEXT_TO_SQL="""You are an expert SQL query generator. Your task is to convert natural language questions into accurate SQL queries based on the provided database schema.
-
-## Database Schema Information
-
-### Table Structure
-```
-Schema: [schema_name]
-Table: [TABLE_NAME]
-Columns:
-- [column_name_1]: [data_type] - [description]
-- [column_name_2]: [data_type] - [description]
-...
-```
-
-### Column Descriptions and Value Formats
-
-For each column, you have access to:
-1. **Column Name**: The actual database column name (may be cryptic/abbreviated)
-2. **Description**: What the column represents in plain language
-3. **Value Formats**: Multiple acceptable formats for the same data
-
-**Example Column Metadata:**
-```
-Column: cntry_cd
-Description: Country where the transaction occurred
-Data Type: VARCHAR(50)
-Possible Value Formats:
-  - Full name: "Japan", "United States", "Germany"
-  - ISO 3-letter code: "JPN", "USA", "DEU"
-  - ISO 2-letter code: "JP", "US", "DE"
-  - Numeric code: "392", "840", "276"
-Note: Query should account for all formats using UPPER() and handle variations
-```
-
-## Query Generation Instructions
-
-### 1. Column Name Mapping
-- Always use the actual database column names in your SQL, not the descriptions
-- If the user refers to a column by its description (e.g., "country"), map it to the correct column name (e.g., "cntry_cd")
-
-### 2. Value Format Handling
-When filtering by columns with multiple value formats:
-- Use `IN` clauses to check multiple possible formats
-- Apply `UPPER()` or `LOWER()` for case-insensitive matching
-- Consider all documented value formats for that column
-
-**Example:**
-```sql
--- User asks: "Show sales from Japan"
--- Bad query:
-SELECT * FROM sales WHERE cntry_cd = 'Japan';
-
--- Good query:
-SELECT * FROM sales 
-WHERE UPPER(cntry_cd) IN ('JAPAN', 'JPN', 'JP', '392');
-```
-
-### 3. Pattern Matching
-For columns with inconsistent formatting:
-- Use `LIKE` with wildcards when appropriate
-- Use `TRIM()` to handle extra whitespace
-- Consider using `REGEXP` for complex patterns if supported
-
-### 4. Query Structure Best Practices
-- Always use explicit column names, never `SELECT *` unless specifically requested
-- Include appropriate `WHERE`, `GROUP BY`, `ORDER BY` clauses as needed
-- Use table aliases for readability in complex queries
-- Add comments to explain non-obvious mappings
-
-### 5. Ambiguity Handling
-If the user's question is ambiguous:
-1. Make reasonable assumptions based on context
-2. Document your assumptions in a comment
-3. Optionally provide alternative interpretations
-
-## Response Format
-
-Provide your response in this structure:
-
-**Understanding:**
-[Brief explanation of what the user is asking for]
-
-**Column Mappings:**
-- [User term] → [Database column name]: [Description]
-
-**Value Format Considerations:**
-- [Any special handling for multiple value formats]
-
-**SQL Query:**
-```sql
-[Your generated SQL query with inline comments]
-```
-
-**Assumptions:**
-[List any assumptions made if the request was ambiguous]
-
-## Example
-
-**User Question:** "How many orders were placed in Japan last month?"
-
-**Understanding:**
-User wants a count of orders from Japan in the previous calendar month.
-
-**Column Mappings:**
-- "orders" → orders table
-- "Japan" → cntry_cd column (Country code)
-- "last month" → order_dt column (Order date)
-
-**Value Format Considerations:**
-- cntry_cd accepts: "Japan", "JPN", "JP", "392"
-- order_dt is DATE type, need to calculate last month's date range
-
-**SQL Query:**
-```sql
-SELECT COUNT(*) as order_count
-FROM orders
-WHERE UPPER(cntry_cd) IN ('JAPAN', 'JPN', 'JP', '392')
-  AND order_dt >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL '1 month')
-  AND order_dt < DATE_TRUNC('month', CURRENT_DATE);
-```
-
-**Assumptions:**
-- "Last month" means the previous calendar month, not the last 30 days
-- Counting all orders regardless of status
-
-## Error Prevention Checklist
-
-Before finalizing your query, verify:
-- ✓ All column names match the actual database schema (not descriptions)
-- ✓ Multiple value formats are handled for relevant columns
-- ✓ String comparisons are case-insensitive where appropriate
-- ✓ Date ranges are correctly calculated
-- ✓ JOINs use proper keys and conditions
-- ✓ Aggregations have appropriate GROUP BY clauses
-- ✓ Column aliases are meaningful and clear
-
-## Additional Context
-
-[Insert your specific database schema, column metadata, and value format documentation here]
-"""
-
+# constant instructions sent as the system message, so that backends with prompt/prefix
+# caching reuse them across the per-chunk requests
+COLUMN_DESCRIPTION_SYSTEM_PROMPT="""You are an expert data analyst. Your task is to infer and describe database column semantics based on its name and sample data values.
 
-COLUMN_DESCRITOPN_PROMPT="""You are an expert data analyst. Your task is to infer and describe database column semantics based on its name and sample data values.
-
-Given:
-{columns_info}
+The columns to describe, with their data types and sample values, are given in the user message.
 
 Instructions:
 1. Analyze the most frequent used query and SQL templates to understand how the column is used in practice if it is presented.
@@ -328,21 +193,19 @@ Instructions:
 3. List all **distinct possible values**, including "null" or "blank" if applicable.
 4. Identify and group **equivalent variations** of the same concept (e.g., capitalization, abbreviations, typos, or alternative spellings).
 5. Provide a **normalization rule** or note explaining how to handle variations (e.g., using `UPPER()` for comparisons).
-6. "Sample Values" should include all distinct formats observed in the sample data, do not include all possible values if there are too many, just representative ones.
-7. Follow the exact output format below.
+6. "sample_values" should include all distinct formats observed in the sample data, do not include all possible values if there are too many, just representative ones.
+7. Describe every given column in a single JSON object keyed by column name, following the exact output format below.
 
 Output Format:
-```
-Column: <column_name>
-Description: <concise explanation of the column meaning>
-Sample Values:
-   - "<value_1>"
-   - "<value_2>"
-   - "<value_3>"
-   - null or blank
-
-Note: Query should account for all formats using UPPER() and handle variations, e.g., "<variation_1>", "<variation_2>", and null or blank should all be treated as "<canonical_value>"
-...
+```json
+{
+  "<column_name>": {
+    "description": "<concise explanation of the column meaning>",
+    "sample_values": ["<value_1>", "<value_2>", "<value_3>", "null or blank"],
+    "note": "Query should account for all formats using UPPER() and handle variations, e.g., '<variation_1>', '<variation_2>', and null or blank should all be treated as '<canonical_value>'"
+  },
+  ...
+}
 ```
 
 ---
@@ -358,17 +221,18 @@ Note: Query should account for all formats using UPPER() and handle variations,
 
 **Output Example:**
 
+```json
+{
+  "employment_status": {
+    "description": "employee employment status within the organization",
+    "sample_values": ["Active", "On Leave", "Pending Verification", "Terminated", "null or blank"],
+    "note": "Query should account for all formats using UPPER() and handle variations; 'ACTIVE', 'active', and null or blank should all be treated as 'Active'"
+  }
+}
 ```
-Column: employment_status
-Description: employee employment status within the organization
-Sample Values:
-   - "Active"
-   - "On Leave"
-   - "Pending Verification"
-   - "Terminated"
-   - null or blank
-
-Note: Query should account for all formats using UPPER() and handle variations; "ACTIVE", "active", and null or blank should all be treated as "Active"
-```
+"""
 
-"""
\ No newline at end of file
+# per-request part of the column description prompt
+COLUMN_DESCRIPTION_USER_PROMPT="""Given:
+{columns_info}
+"""
@@ -1,20 +1,9 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Callable, Dict, Optional, Tuple, Union
 
 
-class SQLPromptBuilder:
-    def __init__(self, schema_context:Union[Path, str], schema_reload:bool=False   ):
-        self.schema_context = schema_context.read_text() if isinstance(schema_context, Path) else schema_context
-        self.schema_reload = schema_reload
-
-    def build_initial_prompt(self, user_query: str) -> str:
-        if self.schema_reload and isinstance(self.schema_context, Path):
-            self.schema_context = self.schema_context.read_text()
-        prompt = f"""You are an expert SQL query generator for PostgreSQL databases.
-
-{self.schema_context}
-
-IMPORTANT INSTRUCTIONS:
+_INITIAL_INSTRUCTIONS = """IMPORTANT INSTRUCTIONS:
 1. Generate ONLY valid PostgreSQL SQL queries
 2. Use proper schema.table notation when querying across multiple schemas
 3. Consider the column descriptions and value mappings provided above
@@ -24,36 +13,30 @@ IMPORTANT INSTRUCTIONS:
 7. Do not include semicolons at the end
 8. Ensure the query is properly formatted and executable
 9. Only produce SELECT/CTE/EXPLAIN queries. No DML/DDL
-10. Prefer schema-qualified table names when helpful
+10. Prefer schema-qualified table names when helpful"""
 
-USER QUERY: {user_query}
+_INITIAL_SUFFIX = """
 
 Generate the SQL query:"""
-        return prompt
 
-    def build_fix_prompt(
-        self,
-        user_query: str,
-        failed_sql: str,
-        error_message: str,
-        attempt: int
-    ) -> str:
-        if self.schema_reload and isinstance(self.schema_context, Path):
-            self.schema_context = self.schema_context.read_text()
-        
-        prompt = f"""The previous SQL query failed to execute. Please fix it.
-
-{self.schema_context}
+# initial prompts kept per builder, they are dropped whenever the schema changes
+_INITIAL_PROMPT_CACHE_SIZE = 128
 
-ORIGINAL USER QUERY: {user_query}
+_FIX_SQL_HEADER = """
 
 FAILED SQL QUERY:
-{failed_sql}
+"""
+
+_FIX_ERROR_HEADER = """
 
 ERROR MESSAGE:
-{error_message}
+"""
+
+_FIX_ATTEMPT_HEADER = """
+
+ATTEMPT: """
 
-ATTEMPT: {attempt}
+_FIX_SUFFIX = """
 
 INSTRUCTIONS:
 1. Analyze the error message carefully
@@ -64,4 +47,94 @@ INSTRUCTIONS:
 6. Do not include semicolons at the end
 
 Generate the corrected SQL query:"""
-        return prompt
\ No newline at end of file
+
+
+@lru_cache(maxsize=16)
+def _read_schema_text(path: str, mtime_ns: int, size: int) -> str:
+    return Path(path).read_text()
+
+
+def read_schema_file(schema_file: Path) -> str:
+    """
+    Read a schema context file, shared by all agents in the process.
+    
+    The text is cached by path, mtime and size, so agents created for the same
+    unchanged file do not read it again.
+    """
+    stat = schema_file.stat()
+    return _read_schema_text(str(schema_file.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+class SQLPromptBuilder:
+    def __init__(self, schema_context:Union[Path, str, Callable[[], str]], schema_reload:bool=False   ):
+        # a callable schema provider is asked for the schema on every prompt and is expected to cache it
+        self.schema_provider = schema_context if callable(schema_context) else None
+        self._schema_path = schema_context if isinstance(schema_context, Path) else None
+        self._schema_key: Optional[Tuple[int, int]] = None
+        self.schema_reload = schema_reload
+        self.schema_context = None
+        # user query -> initial prompt for the current schema context
+        self._initial_prompts: Dict[str, str] = {}
+        if self.schema_provider is not None:
+            self._set_schema_context(self.schema_provider())
+        elif self._schema_path is not None:
+            self._read_schema_file()
+        else:
+            self._set_schema_context(schema_context)
+
+    def _set_schema_context(self, schema_context: str):
+        """Store the schema text and precompute the prompt parts around it"""
+        if schema_context is self.schema_context:
+            return
+        self.schema_context = schema_context
+        self._initial_prompts.clear()
+        self._initial_prefix = f"""You are an expert SQL query generator for PostgreSQL databases.
+
+{schema_context}
+
+{_INITIAL_INSTRUCTIONS}
+
+USER QUERY: """
+        self._fix_prefix = f"""The previous SQL query failed to execute. Please fix it.
+
+{schema_context}
+
+ORIGINAL USER QUERY: """
+
+    def _read_schema_file(self):
+        """Re-read the schema file only when its mtime or size changed"""
+        stat = self._schema_path.stat()
+        schema_key = (stat.st_mtime_ns, stat.st_size)
+        if schema_key != self._schema_key:
+            self._set_schema_context(_read_schema_text(str(self._schema_path.resolve()), *schema_key))
+            self._schema_key = schema_key
+
+    def _refresh_schema_context(self):
+        if self.schema_provider is not None:
+            self._set_schema_context(self.schema_provider())
+        elif self.schema_reload and self._schema_path is not None:
+            self._read_schema_file()
+
+    def build_initial_prompt(self, user_query: str) -> str:
+        self._refresh_schema_context()
+        prompt = self._initial_prompts.get(user_query)
+        if prompt is None:
+            if len(self._initial_prompts) >= _INITIAL_PROMPT_CACHE_SIZE:
+                self._initial_prompts.clear()
+            prompt = self._initial_prompts[user_query] = self._initial_prefix + user_query + _INITIAL_SUFFIX
+        return prompt
+
+    def build_fix_prompt(
+        self,
+        user_query: str,
+        failed_sql: str,
+        error_message: str,
+        attempt: int
+    ) -> str:
+        self._refresh_schema_context()
+        # only the slots change between retries, the schema head and fixed parts are reused
+        return "".join((self._fix_prefix, user_query,
+                        _FIX_SQL_HEADER, failed_sql,
+                        _FIX_ERROR_HEADER, error_message,
+                        _FIX_ATTEMPT_HEADER, str(attempt),
+                        _FIX_SUFFIX))
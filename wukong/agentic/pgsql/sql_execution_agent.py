@@ -1,24 +1,77 @@
 # agents/sql_executor_agent.py
 
-import json
+import uuid
 from typing import Dict, Any, Optional
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor
 from .pg_client import PostgreSQLClient
 
+# rows fetched per round-trip when a query's result is streamed from a server-side cursor
+DEFAULT_ITERSIZE = 2000
+
 
 class SQLExecutorAgent:
-    def __init__(self, pgclient:PostgreSQLClient):
+    def __init__(self, pgclient:PostgreSQLClient, itersize:int = DEFAULT_ITERSIZE, max_rows:Optional[int] = None):
+        """
+        Args:
+            pgclient: Client whose connection pool runs the queries
+            itersize: Rows fetched per batch (and per round-trip when streaming SELECT results); lower it
+                to reduce peak memory. Defaults to DEFAULT_ITERSIZE.
+            max_rows: Stop reading a result after this many rows, None reads all rows. Defaults to None.
+        """
         self.pgclient = pgclient
+        self.itersize = itersize
+        self.max_rows = max_rows
         
+    def _open_cursor(self, connection, sql: str):
+        """
+        Execute sql and return its cursor. SELECT queries run on a server-side (named) cursor so
+        their rows stream in itersize batches instead of being transferred all at once. Rows are
+        decoded straight into dictionaries.
+        """
+        if self.pgclient._is_select_query(sql):
+            cursor = connection.cursor(name=f"wk_{uuid.uuid4().hex}", cursor_factory=RealDictCursor)
+            cursor.itersize = self.itersize
+            try:
+                cursor.execute(sql)
+                return cursor
+            except psycopg2.errors.FeatureNotSupported:
+                # a WITH query containing INSERT/UPDATE/DELETE cannot be declared as a cursor
+                connection.rollback()
+        cursor = connection.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(sql)
+        return cursor
         
     def execute_query(self, sql: str) -> Dict[str, Any]:
         connection = self.pgclient.get_connection()
+        cursor = None
         try:            
-            cursor = connection.cursor()
-            cursor.execute(sql)
+            cursor = self._open_cursor(connection, sql)
+            
+            rows = []
+            truncated = False
+            if cursor.description or cursor.name:
+                # rows are read itersize at a time (one FETCH per batch on a named cursor, which
+                # describes its columns once the first batch is fetched); one extra row past
+                # max_rows tells whether the result was cut short
+                while True:
+                    size = self.itersize
+                    if self.max_rows is not None:
+                        size = min(size, self.max_rows + 1 - len(rows))
+                    batch = cursor.fetchmany(size)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+                    if self.max_rows is not None and len(rows) > self.max_rows:
+                        del rows[self.max_rows:]
+                        truncated = True
+                        break
+                    if len(batch) < size:
+                        # a short batch is the last one, skip the empty FETCH
+                        break
             
             if cursor.description:
                 columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
                 if not rows:
                     return {
                         "success": False,
@@ -28,8 +81,9 @@ class SQLExecutorAgent:
                 result = {
                     "success": True,
                     "columns": columns,
-                    "rows": [dict(zip(columns, row)) for row in rows],
-                    "row_count": len(rows)
+                    "rows": rows,
+                    "row_count": len(rows),
+                    "truncated": truncated
                 }
             else:
                 result = {
@@ -38,21 +92,64 @@ class SQLExecutorAgent:
                     "rows_affected": cursor.rowcount
                 }
             
-            cursor.close()
             return result
         except Exception as e:
+            if not connection.closed:
+                # do not leave an aborted transaction on the connection for its next user
+                if cursor is not None and not cursor.closed:
+                    cursor.close()
+                connection.rollback()
             return {
                 "success": False,
                 "error": str(e),
                 "error_type": type(e).__name__
             }
         finally:
+            if cursor is not None and not cursor.closed:
+                cursor.close()
             if connection:
                 self.pgclient.release_connection(connection)
                 
                 
 
-    def execute_and_validate(self, sql: str) -> Dict[str, Any]:
+    def explain_query(self, sql: str) -> Optional[Dict[str, Any]]:
+        """
+        Plan sql with EXPLAIN without executing it.
+
+        Args:
+            sql: The SQL query to plan
+
+        Returns:
+            Optional[Dict[str, Any]]: None if the query planned cleanly, otherwise a failed execution result
+        """
+        connection = self.pgclient.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN " + sql)
+            return None
+        except Exception as e:
+            if not connection.closed:
+                connection.rollback()
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+        finally:
+            self.pgclient.release_connection(connection)
+
+    def execute_and_validate(self, sql: str, explain_first: bool = False) -> Dict[str, Any]:
+        """
+        Args:
+            sql: The SQL query to run
+            explain_first: Plan a SELECT/WITH query with EXPLAIN before running it, so planner
+                errors are reported without executing anything. Defaults to False.
+        """
+        # DDL/DML cannot fail cheaper under EXPLAIN, only SELECT/WITH queries are planned first
+        if explain_first and self.pgclient._is_select_query(sql):
+            explain_error = self.explain_query(sql)
+            if explain_error is not None:
+                return self._format_result(sql, explain_error)
         result = self.execute_query(sql)
         return self._format_result(sql, result)
 
@@ -65,6 +162,7 @@ class SQLExecutorAgent:
                 "data": execution_result.get("rows", []),
                 "columns": execution_result.get("columns", []),
                 "row_count": execution_result.get("row_count", 0),
+                "truncated": execution_result.get("truncated", False),
                 "message": "Query executed successfully"
             }
         else:
@@ -75,17 +173,3 @@ class SQLExecutorAgent:
                 "error_type": execution_result["error_type"],
                 "message": "Query execution failed"
             }
-
-    def get_feedback_for_llm(self, result: Dict[str, Any]) -> str:
-        if result["success"]:
-            return json.dumps({
-                "status": "success",
-                "row_count": result["row_count"],
-                "columns": result["columns"]
-            }, indent=2)
-        else:
-            return json.dumps({
-                "status": "error",
-                "error_type": result["error_type"],
-                "error_message": result["error"]
-            }, indent=2)
\ No newline at end of file
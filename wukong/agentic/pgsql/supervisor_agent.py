@@ -1,41 +1,37 @@
 
 import json
 import logging
+import re
 from pathlib import Path
-from typing import Union
+from typing import Callable, Optional, Union
 from wukong.llm.history_manager import LLMHistoryManager
 from wukong.llm.llm_client import LLMClient
+from wukong.llm.stream_stop import JsonObjectStop
+from wukong.llm.batched_streamer import BatchedStreamer
+from .prompt_builder import read_schema_file
 
 logger = logging.getLogger(__name__)
 
+# a select list item: *, a (qualified) column or a function call such as count(*)
+_SELECT_ITEM = r"(?:\*|[\w.\"]+(?:\s*\([^()]*\))?)"
+# questions that are themselves SQL: a SELECT ... FROM <table> followed by the end of the statement
+# or a SQL clause, or a WITH ... AS (SELECT common table expression, optionally EXPLAINed. Phrasing
+# such as "how many" or "explain ..." is left to the LLM, it is as common in general questions.
+_SQL_QUERY_RE = re.compile(
+    r"^\s*(?:explain\s+(?:analyze\s+)?)?(?:"
+    r"with\s+(?:recursive\s+)?[\w\"]+\s+as\s*\(\s*select\b"
+    r"|select\s+(?:distinct\s+)?" + _SELECT_ITEM + r"(?:\s*,\s*" + _SELECT_ITEM + r")*"
+    r"\s+from\s+[\w.\"]+(?:\s*;?\s*$|\s*,|\s+(?:where|join|inner|left|right|full|cross|natural|group|order"
+    r"|limit|offset|having|union|except|intersect|as|on)\b))",
+    re.IGNORECASE,
+)
+# small talk that never needs the database
+_GENERAL_INFO_RE = re.compile(r"^\s*(hi|hello|hey|thanks|thank you)\b[\s!.?]*$", re.IGNORECASE)
+# route labels in a reply that is not valid JSON (prose around it, single quotes, trailing commas)
+_ROUTE_LABEL_RE = re.compile(r"\b(SQL_QUERY|GENERAL_INFO)\b")
 
-class SupervisorAgent:
-    def __init__(self, 
-            schema_context:Union[Path, str],
-            llm_model:str,   
-            llm_client :LLMClient ,
-            chat_history_manager:LLMHistoryManager 
-            ):
-        
-        self.llm_model = llm_model
-        self.llm_client = llm_client
-        self.chat_history_manager = chat_history_manager
-        self.max_retries = 3
-        self.database_schema = schema_context.read_text() if isinstance(schema_context, Path) else schema_context
-        
-    
-    def review_query(self, user_question:str) -> str:
-        prompt = f"""You are a system analyst. Your task is to review the the user's question to determine if it is asking for querying a database. or it is asking for some other information.
-        
-        if the question is asking for querying the database schema defined below, output "SQL_QUERY".
-        if the question is asking for some other information, output "GENERAL_INFO".        
-        
-        ## Here is the database schema:
-        {self.database_schema}
-        
-        ## USER QUESTION:
-        <!user_question!>
-        {user_question}
+# review prompt text after the user question
+_REVIEW_PROMPT_SUFFIX = """
         </!user_question!>
         
         ## OUTPUT FORMAT: json
@@ -47,50 +43,117 @@ class SupervisorAgent:
         
         Question: "show me all tables?"
         Output: 
-        {{
+        {
             "type": "SQL_QUERY"
-        }}
+        }
         
         Question: "Who is the president of the United States?"
         Output:         
-        {{
+        {
             "type": "GENERAL_INFO"      
-        }}
+        }
         
         Question: "Can you reformat the query results ...?"
         Output:         
-        {{
+        {
             "type": "GENERAL_INFO"      
-        }}
+        }
         
         important note: do not include any explanation or extra information, only output the json object as specified.        
         """
+
+
+class SupervisorAgent:
+    def __init__(self, 
+            schema_context:Union[Path, str, Callable[[], str]],
+            llm_model:str,   
+            llm_client :LLMClient ,
+            chat_history_manager:LLMHistoryManager 
+            ):
+        
+        self.llm_model = llm_model
+        self.llm_client = llm_client
+        self.chat_history_manager = chat_history_manager
+        self.max_retries = 3
+        # a callable schema provider is asked for the schema on every review and is expected to cache it
+        self.schema_provider = schema_context if callable(schema_context) else None
+        self.database_schema = None
+        if self.schema_provider is not None:
+            self._set_database_schema(self.schema_provider())
+        else:
+            self._set_database_schema(read_schema_file(schema_context) if isinstance(schema_context, Path) else schema_context)
+    
+    def _set_database_schema(self, database_schema:str):
+        """Store the schema and precompute the review prompt up to the user question"""
+        if database_schema is self.database_schema:
+            return
+        self.database_schema = database_schema
+        self._review_prompt_prefix = f"""You are a system analyst. Your task is to review the the user's question to determine if it is asking for querying a database. or it is asking for some other information.
+        
+        if the question is asking for querying the database schema defined below, output "SQL_QUERY".
+        if the question is asking for some other information, output "GENERAL_INFO".        
+        
+        ## Here is the database schema:
+        {database_schema}
+        
+        ## USER QUESTION:
+        <!user_question!>
+        """
+        
+    
+    @staticmethod
+    def quick_route(user_question:str) -> Optional[str]:
+        """Route obvious questions without an LLM call, returns None when the question is ambiguous"""
+        if _GENERAL_INFO_RE.search(user_question):
+            return "GENERAL_INFO"
+        if _SQL_QUERY_RE.search(user_question):
+            return "SQL_QUERY"
+        return None
+    
+    @staticmethod
+    def parse_route(response:str) -> Optional[str]:
+        """Extract the route from the LLM reply, returns None when it names no route or both routes"""
+        response = response.split("</think>")[-1].strip()
+        try:
+            response_json = json.loads(response)
+            if isinstance(response_json, dict) and "type" in response_json:
+                return response_json["type"]
+        except json.JSONDecodeError:
+            pass
+        # lenient fallback for malformed JSON, cheaper than asking the LLM again
+        labels = set(_ROUTE_LABEL_RE.findall(response))
+        return labels.pop() if len(labels) == 1 else None
+    
+    def review_query(self, user_question:str) -> str:
+        route = self.quick_route(user_question)
+        if route is not None:
+            logger.info(f"Routed user question to {route} without LLM")
+            return route
+        if self.schema_provider is not None:
+            self._set_database_schema(self.schema_provider())
+        prompt = self._review_prompt_prefix + user_question + _REVIEW_PROMPT_SUFFIX
         print("Reviewing user question to determine query type...", self.llm_model)
         for attempt in range(1, self.max_retries + 1):
-            response = ""
-            stream = self.llm_client.invoke_model(
+            streamer = BatchedStreamer()
+            response = self.llm_client.invoke_model(
                 model_id=self.llm_model,
                 prompt=prompt,
-                streaming=True
+                temperature=0,
+                use_cache=True,
+                streaming=True,
+                streaming_handler=streamer,
+                stop_condition=JsonObjectStop()
             )
+            streamer.flush()
             
-            if stream is None:
+            if response is None:
                 return "SQL_QUERY"
-            
-            for chunk in stream:
-                response += chunk
-                print(chunk, end='', flush=True)
             print("\n")     
-            try:
-                response = response.split("</think>")[-1].strip()
-                logger.info(f"LLM Response: {response}")
-                response_json = json.loads(response)
-                if "type" in response_json:
-                    return response_json["type"]
-                else:
-                    print(f"Attempt {attempt}: 'type' field not found in response. Retrying...")
-            except json.JSONDecodeError as e:
-                print(f"Attempt {attempt}: JSON decode error: {e}. Retrying...")
+            logger.info(f"LLM Response: {response}")
+            route = self.parse_route(response)
+            if route is not None:
+                return route
+            print(f"Attempt {attempt}: no query type found in response. Retrying...")
         
         return "GENERAL_INFO"
         
\ No newline at end of file
@@ -1,8 +1,9 @@
 # agents/text_to_sql_agent.py
 # Requires: openai
 
+import re
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Union
 from openai import OpenAI
 from prompt_toolkit import PromptSession
 from prompt_toolkit.history import FileHistory
@@ -12,23 +13,30 @@ from .sql_execution_agent import SQLExecutorAgent
 from .pg_client import PostgreSQLClient
 from wukong.llm.history_manager import LLMHistoryManager
 from wukong.llm.llm_client import LLMClient
+from wukong.llm.stream_stop import CodeFenceStop
+from wukong.llm.batched_streamer import BatchedStreamer
 
 MAX_SQL_RETRY_ATTEMPTS = 3
 
+# body of the first code fence (optionally tagged sql or another language), unterminated fences run to the end
+_SQL_FENCE_RE = re.compile(r"```(?:sql\b|[a-zA-Z]*[ \t]*\n)?(.*?)(?:```|\Z)", re.DOTALL | re.IGNORECASE)
+
 class TextToSQLAgent:
     def __init__(
         self,
-        database_schema: str,
+        database_schema: Union[Path, str, Callable[[], str]],
         model_id:str,
         dbclient:PostgreSQLClient,
         llm_client :LLMClient,   
         reload_schema:bool=False  ,
-        chat_history_manager:LLMHistoryManager = None   
+        chat_history_manager:LLMHistoryManager = None,
+        max_rows:Optional[int] = None
     ):      
         self.prompt_session = self._create_prompt_session()        
         self.prompt_builder = SQLPromptBuilder(database_schema, reload_schema)
         self.llm_client = llm_client
-        self.executor_agent = SQLExecutorAgent(dbclient)
+        # max_rows caps how many result rows are read, None reads them all
+        self.executor_agent = SQLExecutorAgent(dbclient, max_rows=max_rows)
         self.chat_history_manager = chat_history_manager
         self.selected_model = model_id    
         self.max_retries = MAX_SQL_RETRY_ATTEMPTS   
@@ -46,30 +54,30 @@ class TextToSQLAgent:
           
 
     def _clean_sql(self, sql: str) -> str:        
-        sql = sql.split("</think>")[-1].strip()  # in case LLM adds <think> tags
-        sql = sql.strip()
-        if sql.startswith("```sql"):
-            sql = sql[6:]
-        elif sql.startswith("```"):
-            sql = sql[3:]
-        if sql.endswith("```"):
-            sql = sql[:-3]
+        idx = sql.rfind("</think>")  # in case LLM adds <think> tags
+        if idx >= 0:
+            sql = sql[idx + len("</think>"):]
+        match = _SQL_FENCE_RE.search(sql)
+        if match:
+            sql = match.group(1)
         sql = sql.strip()
-        if sql.endswith(";"):
-            sql = sql[:-1]
-        return sql
+        return sql[:-1].rstrip() if sql.endswith(";") else sql
 
     def generate_and_execute_sql(self, user_query: str) -> Dict[str, Any]:        
         prompt = self.prompt_builder.build_initial_prompt(user_query)        
         for attempt in range(1, MAX_SQL_RETRY_ATTEMPTS + 1):
-            sql_response = ""
-            for chunk in self.llm_client.invoke_model_stream(prompt=prompt):
-                sql_response += chunk
-                print(chunk, end='', flush=True)
+            streamer = BatchedStreamer()
+            # a fenced reply is complete at its closing fence, anything after it is explanation
+            sql_response = self.llm_client.invoke_model_stream(prompt=prompt, temperature=0, use_cache=True,
+                                                               streaming_handler=streamer,
+                                                               stop_condition=CodeFenceStop()) or ""
+            streamer.flush()
             print("\n")     
             sql = self._clean_sql(sql_response)
             
-            result = self.executor_agent.execute_and_validate(sql)
+            # a corrected query is planned before it runs, so one that is still wrong fails
+            # at planning cost instead of after a full (possibly expensive) execution
+            result = self.executor_agent.execute_and_validate(sql, explain_first=attempt > 1)
             
             if result["success"]:
                 return {
@@ -79,11 +87,11 @@ class TextToSQLAgent:
                     "data": result["data"],
                     "columns": result["columns"],
                     "row_count": result["row_count"],
+                    "truncated": result["truncated"],
                     "attempts": attempt
                 }
             
             if attempt < MAX_SQL_RETRY_ATTEMPTS:
-                feedback = self.executor_agent.get_feedback_for_llm(result)
                 prompt = self.prompt_builder.build_fix_prompt(
                     user_query,
                     sql,
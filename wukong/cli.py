@@ -1,17 +1,40 @@
+import importlib
 import click
-from wukong.project_init import init_project
-from wukong.project_create import create_project
-from wukong.shell import shell
-from wukong.code_review import (
-    review_code,
-    explain_code,
-    refactor_code,    
-)  # Import the review_code function
-from wukong.coder import code_assitant
-from wukong.wukong_config import config
-from wukong.agentic.pgsql.commands import pg_sql
-from wukong.unittest.commands import create_unit_tests
-@click.group()
+
+# command name -> "module:attribute", imported only when the command is looked up
+COMMANDS = {
+    "init": "wukong.project_init:init_project",
+    "create": "wukong.project_create:create_project",
+    "review": "wukong.code_review:review_code",
+    "explain": "wukong.code_review:explain_code",
+    "refactor": "wukong.code_review:refactor_code",
+    "unittest": "wukong.unittest.commands:create_unit_tests",
+    "shell": "wukong.shell:shell",
+    "code": "wukong.coder:code_assitant",
+    "config": "wukong.wukong_config:config",
+    "postgresql": "wukong.agentic.pgsql.commands:pg_sql",
+}
+
+
+class LazyGroup(click.Group):
+    """Click group that imports a subcommand's module only when that command is used."""
+
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name].split(":")
+            self.add_command(getattr(importlib.import_module(module_name), attr), cmd_name)
+            del self.lazy_commands[cmd_name]
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 def cli():
     """
     Razor-sharp AI wizard weaving code with unparalleled intellect!
@@ -32,16 +55,5 @@ def cli():
     pass
 
 
-cli.add_command(init_project, "init")
-cli.add_command(create_project, "create")
-cli.add_command(review_code, "review")  # Add the review_code command
-cli.add_command(explain_code, "explain")  # Add the explain_code command
-cli.add_command(refactor_code, "refactor")  # Add the refactor_code command
-cli.add_command(create_unit_tests, "unittest")  # Add the create_unit_tests command
-cli.add_command(shell, "shell")  # Add the shell command
-cli.add_command(code_assitant, "code")  # Add the code_assistant command
-cli.add_command(config, "config")  # Add the config command
-cli.add_command(pg_sql, "postgresql")  # Add the pg_sql command
-
 if __name__ == "__main__":
     cli()
@@ -32,9 +32,8 @@ def write_sample_file(target_directory, filename, target_filename=None):
     file_path = os.path.join(src_dir, "samples", filename)
     tgt_filename = target_filename or filename
     out_path = os.path.join(target_directory, tgt_filename)
-    with open(file_path, "rb") as fin:
-        with open(out_path, "wb") as fout:
-            fout.write(fin.read())
+    # copyfile uses the kernel's zero-copy path where available instead of reading the file into memory
+    shutil.copyfile(file_path, out_path)
 
 
 def make_nested_dirs(first_dir, *dirs):
@@ -99,11 +98,20 @@ def install_and_add_connector(
             print(f"Error writing to '{requirements_file}': {e}")
             return False
 
-    # --- Step 3: Install the package using pip ---
+    # --- Step 3: Install the package using uv if available, otherwise pip ---
     try:
-        # Use sys.executable to ensure the correct pip is used (associated with the current Python environment)
+        # Target sys.executable to install into the current Python environment
+        uv = shutil.which("uv")
+        if uv:
+            install_cmd = [uv, "pip", "install", "--python", sys.executable, connector_package_name]
+        else:
+            install_cmd = [
+                sys.executable, "-m", "pip", "install",
+                "--no-input", "--disable-pip-version-check",
+                connector_package_name,
+            ]
         subprocess.run(
-            [sys.executable, "-m", "pip", "install", connector_package_name],
+            install_cmd,
             capture_output=True,
             text=True,
             check=True,  # Raises CalledProcessError if the command returns a non-zero exit code
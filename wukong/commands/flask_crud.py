@@ -31,7 +31,6 @@ def generate_crud_api_resource(context):
 
 def generate_crud_dao(context):
     output = template_render.render_template("backend/dao.py.j2", context)
-    print(output)
     return output
 
 
@@ -89,6 +88,7 @@ def generate_crud(table: Table, tables: List[Table]):
         raise ValueError("Please run `wukong init flask` first")
     project_root_dir = wukong_cfg["project_root_dir"]
     backend_dir = wukong_cfg["backend"]["dir"]
+    app_dir = os.path.join(project_root_dir, backend_dir, "app")
 
     table_singular_snakecase_name = utils.to_singular_snake_case(table.name)
     table_plural_snakecase_name = utils.to_plural_snake_case(table.name)
@@ -119,39 +119,19 @@ def generate_crud(table: Table, tables: List[Table]):
         "is_postgres": is_postgres,
         "child_relationships": child_relationships,
     }
-    model_path = os.path.join(
-        project_root_dir,
-        backend_dir,
-        "app/models",
-        f"{table_singular_snakecase_name}.py",
-    )
+    model_path = os.path.join(app_dir, "models", f"{table_singular_snakecase_name}.py")
     utils.write_source_file(model_path, generate_crud_sqlalchemy_model(context))
     print("writed flask-sqlalchemy model to", model_path)
 
-    schema_path = os.path.join(
-        project_root_dir,
-        backend_dir,
-        "app/schemas",
-        f"{table_singular_snakecase_name}.py",
-    )
+    schema_path = os.path.join(app_dir, "schemas", f"{table_singular_snakecase_name}.py")
     utils.write_source_file(schema_path, generate_crud_pydantic_schema(context))
     print("writed pydantic schema to", schema_path)
 
-    schema_path = os.path.join(
-        project_root_dir,
-        backend_dir,
-        "app/api",
-        f"{table_singular_snakecase_name}.py",
-    )
+    schema_path = os.path.join(app_dir, "api", f"{table_singular_snakecase_name}.py")
 
     utils.write_source_file(schema_path, generate_crud_api_resource(context))
 
     generate_crud_service(context)
 
-    dao_path = os.path.join(
-        project_root_dir,
-        backend_dir,
-        "app/dao",
-        f"{table_singular_snakecase_name}.py",
-    )
+    dao_path = os.path.join(app_dir, "dao", f"{table_singular_snakecase_name}.py")
     utils.write_source_file(dao_path, generate_crud_dao(context))
@@ -1,7 +1,21 @@
 import re
+from functools import lru_cache
 from pgsql_parser import Column, Table, ForeignKey
 from typing import List
 
+# name transforms are pure and run for the same few table/column names from every template,
+# so their results are memoized
+_NAME_CACHE_SIZE = 4096
+
+_ACRONYM_BOUNDARY_RE = re.compile(r"(?<=[A-Z])([A-Z][a-z])")
+_CAMEL_BOUNDARY_RE = re.compile(r"(?<=[a-z0-9])([A-Z])")
+_NON_ALNUM_RUN_RE = re.compile(r"[^a-zA-Z0-9]+")
+_UNDERSCORE_RUN_RE = re.compile(r"_+")
+_NON_UPPER_ALNUM_CHAR_RE = re.compile(r"^[^A-Z0-9]$")
+_UPPER_CHAR_RE = re.compile(r"^[A-Z]$")
+_NON_ALNUM_CHAR_RE = re.compile(r"^[^a-zA-Z0-9]$")
+_TYPE_ARGS_RE = re.compile(r"[(].+[)]")
+
 
 sql_type_to_flask_sqlalchemy_types = {
     "VARCHAR": "db.String",
@@ -127,6 +141,7 @@ def to_composite_fk_str(fk: ForeignKey) -> str:
     return f"db.ForeignKeyConstraint({cols_str}, {refcols_str})"
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_snake_case(input_string: str) -> str:
     """
     Converts a given string to snake_case.
@@ -149,7 +164,7 @@ def to_snake_case(input_string: str) -> str:
     # but only if it's preceded by another uppercase letter. This helps in breaking acronyms properly.
     # Example: "HTTPResponse" -> "HTTP_Response"
     # Example: "XMLHttpRequest" -> "XML_HttpRequest"
-    s = re.sub(r"(?<=[A-Z])([A-Z][a-z])", r"_\1", input_string)
+    s = _ACRONYM_BOUNDARY_RE.sub(r"_\1", input_string)
 
     # Step 1.2: Insert an underscore before any uppercase letter that is preceded
     # by a lowercase letter or a digit. This handles "CamelCase" and "PascalCase".
@@ -157,7 +172,7 @@ def to_snake_case(input_string: str) -> str:
     # Example: "TestString123" -> "Test_String123"
     # Example: "String123Test" -> "String123_Test"
     # Example: "XML_HttpRequest" -> "XML_Http_Request" (applies to 'R' in 'Request')
-    s = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", s)
+    s = _CAMEL_BOUNDARY_RE.sub(r"_\1", s)
 
     # Step 2: Replace any sequence of non-letter and non-digit characters
     # (including whitespace) with a single underscore. This regex specifically
@@ -166,7 +181,7 @@ def to_snake_case(input_string: str) -> str:
     # Example: "Hello World! This is a Test--String123" -> "Hello_World_This_is_a_Test_String123"
     # Example: "foo-bar" -> "foo_bar"
     # Example: "foo!bar" -> "foo_bar"
-    s = re.sub(r"[^a-zA-Z0-9]+", "_", s)
+    s = _NON_ALNUM_RUN_RE.sub("_", s)
 
     # Step 3: Convert the entire string to lowercase.
     # Example: "Hello_World" -> "hello_world"
@@ -182,11 +197,12 @@ def to_snake_case(input_string: str) -> str:
     # (e.g., "foo___bar"), or if previous steps inadvertently created consecutive
     # underscores (though steps 1 and 2 are designed to minimize this).
     # Example: "foo___bar" -> "foo_bar"
-    s = re.sub(r"_+", "_", s)
+    s = _UNDERSCORE_RUN_RE.sub("_", s)
 
     return s
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_pascal_case(input_string: str) -> str:
     """
     Converts a given string to PascalCase.
@@ -217,7 +233,7 @@ def normalize_words(words: List[str]) -> List[str]:
                 norm_words.append("".join(buf))
                 buf = []
             norm_words.append(word)
-        elif re.match(r"^[^A-Z0-9]$", word):
+        elif _NON_UPPER_ALNUM_CHAR_RE.match(word):
 
             if len(buf) > 0:
                 norm_words.append("".join(buf))
@@ -247,12 +263,12 @@ def split_words(word_or_multi_words: str) -> List[str]:
     while pos < lcnt:
         c = word_or_multi_words[pos]
         pos += 1
-        if re.match(r"^[A-Z]$", c):
+        if _UPPER_CHAR_RE.match(c):
             if len(buf) > 0:
                 words.append("".join(buf))
                 buf = []
             buf.append(c)
-        elif re.match(r"^[^a-zA-Z0-9]$", c):
+        elif _NON_ALNUM_CHAR_RE.match(c):
             if len(buf) > 0:
                 words.append("".join(buf))
                 buf = []
@@ -265,6 +281,7 @@ def split_words(word_or_multi_words: str) -> List[str]:
     return normalize_words(words)
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_singular(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -277,6 +294,7 @@ def to_singular(word_or_multi_words) -> str:
     return "".join(words)
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_singular_snake_case(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -287,9 +305,10 @@ def to_singular_snake_case(word_or_multi_words) -> str:
     if plural.lower() == last_word.lower():
         words[-1] = singular
     ret_word = "_".join(words).lower()
-    return re.sub(r"[_]+", "_", ret_word).strip("_")
+    return _UNDERSCORE_RUN_RE.sub("_", ret_word).strip("_")
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_singular_pascal_case(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -303,6 +322,7 @@ def to_singular_pascal_case(word_or_multi_words) -> str:
     return ret_word
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_decription(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -313,6 +333,7 @@ def to_decription(word_or_multi_words) -> str:
     return ret_word
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_plural(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -325,6 +346,7 @@ def to_plural(word_or_multi_words) -> str:
     return "".join(words)
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_plural_snake_case(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -334,9 +356,10 @@ def to_plural_snake_case(word_or_multi_words) -> str:
     plural = pluralize(singular)
     words[-1] = plural
     ret_word = "_".join(words).lower()
-    return re.sub(r"[_]+", "_", ret_word).strip("_")
+    return _UNDERSCORE_RUN_RE.sub("_", ret_word).strip("_")
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def to_plural_pascal_case(word_or_multi_words) -> str:
     words = split_words(word_or_multi_words)
     if not words:
@@ -349,6 +372,7 @@ def to_plural_pascal_case(word_or_multi_words) -> str:
     return ret_word
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def singularize(word):
     """
     Convert a plural noun to its singular form.
@@ -439,6 +463,7 @@ def singularize(word):
     return word
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def pluralize(word):
     """
     Convert a singular noun to its plural form.
@@ -633,7 +658,7 @@ def get_sqlalchemy_type_imports(table: Table) -> str:
     types = set()
     for col in table.columns.values():
         sqlaltype = get_sqlalchemy_type(col)
-        sqlaltype = re.sub(r"[(].+[)]", "", sqlaltype)
+        sqlaltype = _TYPE_ARGS_RE.sub("", sqlaltype)
         types.add(sqlaltype)
     return list(types)
 
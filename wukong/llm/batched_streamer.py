@@ -0,0 +1,58 @@
+import sys
+import time
+from typing import List, TextIO
+
+
+class BatchedStreamer:
+    """
+    Streaming handler that writes LLM chunks to a stream in batches.
+
+    Chunks are buffered and written with a single write + flush once max_chunks
+    chunks are pending or max_delay seconds have passed since the last flush, so
+    output stays live without a flush syscall per token. When the stream is not a
+    terminal (piped or redirected output) batches are written without flushing.
+    Call flush() once the stream has finished to write the remainder.
+    """
+
+    def __init__(self, stream: TextIO = None, max_chunks: int = 32, max_delay: float = 0.03):
+        """
+        Args:
+            stream (TextIO, optional): Output stream. Defaults to sys.stdout at write time.
+            max_chunks (int): Number of pending chunks that triggers a flush. Defaults to 32.
+            max_delay (float): Seconds after which pending chunks are flushed. Defaults to 0.03.
+        """
+        self.stream = stream
+        self.max_chunks = max_chunks
+        self.max_delay = max_delay
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._isatty = None
+
+    def __call__(self, chunk: str):
+        self._buffer.append(chunk)
+        if len(self._buffer) >= self.max_chunks or time.monotonic() - self._last_flush >= self.max_delay:
+            self._write(self._is_terminal())
+
+    def flush(self):
+        """
+        Write and flush the pending chunks.
+        """
+        self._write(True)
+
+    def _stream(self) -> TextIO:
+        return self.stream if self.stream is not None else sys.stdout
+
+    def _is_terminal(self) -> bool:
+        if self._isatty is None:
+            isatty = getattr(self._stream(), "isatty", None)
+            self._isatty = bool(isatty and isatty())
+        return self._isatty
+
+    def _write(self, flush: bool):
+        stream = self._stream()
+        if self._buffer:
+            stream.write("".join(self._buffer))
+            self._buffer.clear()
+        if flush:
+            stream.flush()
+        self._last_flush = time.monotonic()
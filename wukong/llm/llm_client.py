@@ -1,10 +1,12 @@
 import getpass
 from pathlib import Path
-from typing import Any, Callable, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
 from openai import OpenAI, OpenAIError, RateLimitError, BadRequestError
 import httpx
 
 from .history_manager import LLMHistoryManager
+from .response_cache import LLMResponseCache
 
 
 class LLMClient:
@@ -18,6 +20,7 @@ class LLMClient:
                  history_manager:LLMHistoryManager = None,
                  history_limit:int = 100,
                  streaming_handler:Callable[[str], None]=None,
+                 response_cache:LLMResponseCache = None,
                  ):   
         self.base_url = base_url
         self.api_key = api_key or "llmclient"        
@@ -28,6 +31,7 @@ class LLMClient:
         self.history_manager = history_manager 
         self.history_limit = history_limit
         self.streaming_handler = streaming_handler
+        self.response_cache = response_cache
         
     def _get_llm(self)->OpenAI:
         granular_timeout = httpx.Timeout(25.0, connect=5.0, read=180.0, write=5.0)        
@@ -52,12 +56,15 @@ class LLMClient:
                      model_id:str = None,
                      max_tokens:int = 0, 
                      max_completion_tokens:int = 0, 
-                     temperature=0.1,
+                     temperature:Optional[float] = None,
                      system_prompt:str = None,
                      history_manager:LLMHistoryManager = None,
                      streaming:bool = False,
                      include_history:bool = True,
                      streaming_handler:Callable = None,
+                     response_format:dict = None,
+                     stop_condition:Callable[[str], bool] = None,
+                     use_cache:bool = False,
                      )->str:
         """ Invoke the LLM model with the given prompt or messages. 
             Either prompt or messages must be provided. If both are provided, messages will be used.
@@ -67,12 +74,15 @@ class LLMClient:
             model_id (str, optional): The model ID to use. If not provided, the default model ID will be used. Defaults to None.
             max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 0.
             max_completion_tokens (int, optional): The maximum number of tokens for completion. Defaults to 0.
-            temperature (float, optional): The temperature for the LLM. Defaults to 0.1.
+            temperature (float, optional): The sampling temperature. Only sent when set, so backends and models that reject a non-default temperature keep working. Defaults to None (the server default).
             system_prompt (str, optional): The system prompt to prepend to the messages. Defaults to None.
             history_manager (LLMHistoryManager, optional): The history manager to use. If not provided, the default history manager will be used. Defaults to None.
             streaming (bool, optional): Whether to stream the response. Defaults to False.
             include_history (bool, optional): Whether to include chat history in the messages. Defaults to True.
             streaming_handler (Callable, optional): A callable that takes a string and handles streaming output. If not provided, output will be printed directly. Defaults to None.
+            response_format (dict, optional): OpenAI style response format, e.g. {"type": "json_object"}. Dropped if the backend rejects it. Defaults to None.
+            stop_condition (Callable, optional): Streaming only. Called with each chunk; once it returns True the stream is closed and the text received so far is returned, e.g. wukong.llm.stream_stop.JsonObjectStop(). Defaults to None.
+            use_cache (bool, optional): Serve the response from, and store it in, the client's response_cache. Only set it for requests whose answer is deterministic (e.g. temperature=0). Defaults to False.
         """
         llm = self._get_llm()        
         req_max_tokens = max(max_tokens, max_completion_tokens)
@@ -92,15 +102,48 @@ class LLMClient:
         
         invoke_stream_handler = streaming_handler if streaming_handler is not None else self.streaming_handler
         selected_model = model_id if model_id is not None else self.model_id
+        cache_key = None
+        if self.response_cache is not None and use_cache:
+            cache_key = self.response_cache.make_key(selected_model, llm_messages, temperature, response_format)
+            cached_txt = self.response_cache.get(cache_key)
+            if cached_txt is not None:
+                if streaming:
+                    if invoke_stream_handler:
+                        invoke_stream_handler(cached_txt)
+                        invoke_stream_handler("\n")
+                    else:
+                        print(cached_txt, flush=True)
+                if history_manager is not None and include_history:
+                    history_manager.add_entry(llm_messages[-1]) # only add user message
+                    history_manager.add_assistant_message(cached_txt)
+                return cached_txt
+        
         models = [selected_model] + self.fallback_models if self.fallback_models else [selected_model]
+        sampling_params = {"temperature": temperature} if temperature is not None else {}
+        extra_params = {"response_format": response_format} if response_format is not None else {}
         for model_id in models:
             try:                
-                response = llm.chat.completions.create(        
-                    model=model_id,  # or any other model you want to use
-                    max_completion_tokens = req_max_tokens,
-                    messages=llm_messages,
-                    stream=streaming                    
-                )  
+                try:
+                    response = llm.chat.completions.create(        
+                        model=model_id,  # or any other model you want to use
+                        max_completion_tokens = req_max_tokens,
+                        messages=llm_messages,
+                        stream=streaming,
+                        **sampling_params,
+                        **extra_params
+                    )  
+                except BadRequestError:
+                    if not extra_params:
+                        raise
+                    # backend does not support response_format, rely on the prompt instead
+                    extra_params = {}
+                    response = llm.chat.completions.create(        
+                        model=model_id,
+                        max_completion_tokens = req_max_tokens,
+                        messages=llm_messages,
+                        stream=streaming,
+                        **sampling_params
+                    )  
                 response_txt = ""              
                 if streaming:                    
                     for chunk in response:                        
@@ -111,7 +154,11 @@ class LLMClient:
                             if invoke_stream_handler:
                                 invoke_stream_handler(resp_chunk)
                             else:
-                                print(resp_chunk, end="", flush=True)                    
+                                print(resp_chunk, end="", flush=True)
+                            if stop_condition is not None and stop_condition(resp_chunk):
+                                # the answer is complete, do not wait for the tokens after it
+                                response.close()
+                                break                    
                     print() # newline after stream finished 
                     if invoke_stream_handler:
                         invoke_stream_handler("\n")                   
@@ -121,6 +168,8 @@ class LLMClient:
                 if history_manager is not None and include_history:
                     history_manager.add_entry(llm_messages[-1]) # only add user message
                     history_manager.add_assistant_message(response_txt)
+                if cache_key is not None and response_txt:
+                    self.response_cache.put(cache_key, response_txt)
                 return response_txt          
             except RateLimitError as e:
                 print(f"Rate limit exceeded: {e}")
@@ -140,11 +189,14 @@ class LLMClient:
                      model_id:str = None,
                      max_tokens:int = 0, 
                      max_completion_tokens:int = 0, 
-                     temperature=0.1,
+                     temperature:Optional[float] = None,
                      system_prompt:str = None,
                      history_manager:LLMHistoryManager = None,
                      include_history:bool = True,
                      streaming_handler:Callable = None,
+                     response_format:dict = None,
+                     stop_condition:Callable[[str], bool] = None,
+                     use_cache:bool = False,
                      )->str:        
         return self.invoke_model(prompt=prompt, 
                                  messages=messages, 
@@ -156,5 +208,24 @@ class LLMClient:
                                  history_manager=history_manager,
                                  streaming=True,
                                  include_history=include_history, 
-                                 streaming_handler=streaming_handler)
+                                 streaming_handler=streaming_handler,
+                                 response_format=response_format,
+                                 stop_condition=stop_condition,
+                                 use_cache=use_cache)
     
+
+    def invoke_model_batch(self, prompts:List[str], max_workers:int = 4, **kwargs)->List[str]:
+        """ Invoke the LLM model for several independent prompts concurrently.
+            The OpenAI compatible API has no synchronous batch endpoint, so the requests are
+            issued in parallel and their latencies overlap instead of adding up.
+        Args:
+            prompts (List[str]): The prompts to send to the LLM.
+            max_workers (int, optional): Maximum number of requests in flight. Defaults to 4.
+            **kwargs: Other invoke_model arguments (except prompt, messages and streaming), applied to every prompt.
+        Returns:
+            List[str]: The responses, in the order of the prompts; None for a failed request.
+        """
+        if len(prompts) <= 1:
+            return [self.invoke_model(prompt=prompt, **kwargs) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            return list(executor.map(lambda prompt: self.invoke_model(prompt=prompt, **kwargs), prompts))
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache of LLM responses.
+
+    Responses are stored as JSON files under $HOME/.wukong/llm_cache, one file per
+    sha256 key of (model_id, messages, temperature, response_format). Only deterministic requests
+    (temperature == 0) should be cached.
+
+    Attributes:
+        cache_dir (Path): Directory holding the cached responses.
+        ttl_seconds (int): Age after which a cached response is ignored.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_seconds: int = 7 * 24 * 3600):
+        """
+        Initialize the LLM response cache.
+
+        Args:
+            cache_dir (Optional[Path]): Cache directory. Defaults to $HOME/.wukong/llm_cache.
+            ttl_seconds (int): Time to live of a cached response in seconds. Defaults to 7 days.
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else Path.home() / '.wukong' / 'llm_cache'
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_id: str, messages: List[Dict[str, Any]], temperature: float,
+                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Compute the cache key of a request.
+
+        Args:
+            model_id (str): The model ID.
+            messages (List[Dict[str, Any]]): The messages sent to the LLM.
+            temperature (float): The sampling temperature.
+            response_format (Optional[Dict[str, Any]]): The requested response format, if any. Defaults to None.
+
+        Returns:
+            str: sha256 hex digest of the request.
+        """
+        payload = json.dumps({"model": model_id, "messages": messages, "temperature": temperature,
+                              "response_format": response_format},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Retrieve a cached response.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The cached response, or None if missing, expired or unreadable.
+        """
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return None
+        if time.time() - entry.get('created', 0) > self.ttl_seconds:
+            return None
+        return entry.get('response')
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Store a response in the cache.
+
+        Args:
+            key (str): The cache key.
+            response (str): The LLM response text.
+        """
+        entry = {'created': time.time(), 'response': response}
+        # write to a temporary file and move it into place, so a concurrent get never reads a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        """
+        Remove all cached responses.
+        """
+        for cache_file in self.cache_dir.glob("*.json"):
+            cache_file.unlink(missing_ok=True)
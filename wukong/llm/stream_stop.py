@@ -0,0 +1,78 @@
+from .think_filter import ThinkTagFilter
+
+
+class JsonObjectStop:
+    """
+    Stop condition for LLMClient.invoke_model that ends the stream once a complete
+    top-level JSON object has arrived.
+
+    Braces inside JSON strings and inside a leading <think> block are ignored, so
+    the stream is only cut after the closing brace of the answer itself.
+    """
+
+    def __init__(self):
+        self._think_filter = ThinkTagFilter()
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def __call__(self, chunk: str) -> bool:
+        """
+        Args:
+            chunk (str): The next streamed chunk.
+
+        Returns:
+            bool: True once the first top-level JSON object is complete.
+        """
+        for ch in self._think_filter.feed(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = self._depth > 0
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    return True
+        return False
+
+
+class CodeFenceStop:
+    """
+    Stop condition for LLMClient.invoke_model that ends the stream once a fenced
+    (```) code block has been closed. Fences inside a leading <think> block are ignored.
+    """
+
+    FENCE = "```"
+
+    def __init__(self):
+        self._think_filter = ThinkTagFilter()
+        self._text = ""
+        self._pos = 0
+        self._fences = 0
+
+    def __call__(self, chunk: str) -> bool:
+        """
+        Args:
+            chunk (str): The next streamed chunk.
+
+        Returns:
+            bool: True once the closing fence of the first code block has arrived.
+        """
+        self._text += self._think_filter.feed(chunk)
+        while True:
+            idx = self._text.find(self.FENCE, self._pos)
+            if idx < 0:
+                # a fence may be split across chunks, rescan its possible start next time
+                self._pos = max(self._pos, len(self._text) - len(self.FENCE) + 1)
+                return False
+            self._fences += 1
+            self._pos = idx + len(self.FENCE)
+            if self._fences == 2:
+                return True
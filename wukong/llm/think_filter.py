@@ -0,0 +1,66 @@
+from typing import List
+
+
+class ThinkTagFilter:
+    """
+    Streaming filter that drops a leading <think>...</think> reasoning block.
+
+    Chunks are fed as they arrive from the LLM; only the text after the closing
+    tag is kept, so the chain-of-thought is never buffered. Responses that do not
+    start with <think> pass through unchanged.
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._state = "start"  # start -> thinking -> visible
+        self._pending = ""     # undecided prefix, or tail that may hold a partial closing tag
+        self._visible: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        """
+        Feed a streamed chunk.
+
+        Args:
+            chunk (str): The next chunk of the LLM response.
+
+        Returns:
+            str: The newly visible text, possibly empty.
+        """
+        if self._state == "visible":
+            return self._emit(chunk)
+
+        self._pending += chunk
+        if self._state == "start":
+            stripped = self._pending.lstrip()
+            if len(stripped) < len(self.OPEN_TAG) and self.OPEN_TAG.startswith(stripped):
+                return ""
+            if not stripped.startswith(self.OPEN_TAG):
+                self._state = "visible"
+                text, self._pending = self._pending, ""
+                return self._emit(text)
+            self._state = "thinking"
+            self._pending = stripped[len(self.OPEN_TAG):]
+
+        idx = self._pending.find(self.CLOSE_TAG)
+        if idx < 0:
+            self._pending = self._pending[-(len(self.CLOSE_TAG) - 1):]
+            return ""
+        self._state = "visible"
+        text, self._pending = self._pending[idx + len(self.CLOSE_TAG):], ""
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        if text:
+            self._visible.append(text)
+        return text
+
+    def text(self) -> str:
+        """
+        Returns:
+            str: The visible response so far, stripped of surrounding whitespace.
+        """
+        if self._state == "start":
+            return self._pending.strip()
+        return "".join(self._visible).strip()
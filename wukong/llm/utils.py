@@ -1,6 +1,9 @@
+from functools import lru_cache
+from typing import Tuple
 from ..wukong_config import wukong_config, WukongConfigManager
 from .history_manager import LLMHistoryManager
 from .llm_client import LLMClient
+from .response_cache import LLMResponseCache
 
 
 
@@ -31,4 +34,47 @@ def create_llm_client(model_id: str = None,
             history_limit=history_limit,
             streaming_handler=streaming_handler
         )
-        return llm_client
\ No newline at end of file
+        return llm_client
+
+
+@lru_cache(maxsize=None)
+def llm_client_for(section: str = "llm",
+                   history_manager: LLMHistoryManager = None,
+                   config: WukongConfigManager = None
+                   ) -> Tuple[str, LLMClient]:
+    """
+    Build the LLM client configured by a .wukong.toml section, once per arguments.
+
+    base_url and api_key come from [llm]; the other options come from the given
+    section and fall back to [llm].
+
+    Args:
+        section (str): Configuration section holding model_id, e.g. "llm" or "text_to_sql".
+        history_manager (LLMHistoryManager, optional): Chat history used by the client.
+        config (WukongConfigManager, optional): Configuration to read. Defaults to wukong_config.
+
+    Returns:
+        Tuple[str, LLMClient]: The resolved model ID and the client.
+    """
+    config = config if config is not None else wukong_config
+    llm_config = config.get("llm", {})
+    section_config = config.get(section, {}) if section != "llm" else llm_config
+
+    def option(name, default=None):
+        return section_config.get(name, llm_config.get(name, default))
+
+    model_id = section_config.get("model_id", None)
+    assert model_id is not None, f"model_id must be specified in [{section}] section of .wukong.toml"
+    model_id = model_id[0] if isinstance(model_id, list) else model_id
+    llm_client = LLMClient(
+        model_id=model_id,
+        base_url=llm_config.get("base_url", None),
+        api_key=llm_config.get("api_key", None),
+        max_completion_tokens=option("max_completion_tokens"),
+        fallback_models=option("fallback_models", []),
+        history_manager=history_manager,
+        history_limit=option("history_limit", 100),
+        streaming_handler=None,
+        response_cache=LLMResponseCache() if option("response_cache", False) else None
+    )
+    return model_id, llm_client
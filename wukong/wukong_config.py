@@ -8,6 +8,8 @@ from pathlib import Path
 
 logger=logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 # --- TOMLConfigManager Class ---
 class WukongConfigManager:
@@ -28,6 +30,7 @@ class WukongConfigManager:
         self.config = {}
         self.global_config = {}
         self._is_loaded = False  # Track if a config has been successfully loaded
+        self._cache = {}  # dotted key path -> resolved value (None if not found)
         self.load_config()
 
     def _find_file_in_parent_tree(self):
@@ -75,6 +78,7 @@ class WukongConfigManager:
         self.global_config = self._load_config(
             WukongConfigManager._get_global_config_path()
         )
+        self._cache.clear()
         self._is_loaded = True
 
     def save_config(self, is_global=False):
@@ -114,13 +118,14 @@ class WukongConfigManager:
         Returns:
             The value at the specified key path, or the default value if not found.
         """
-        # First check in local config, then in global config
-        value = self._get_value(key_path, self.config, default=None)
-        if value is not None:
-            return value
-
-        # print(json.dumps(self.global_config, indent=2))  # --- IGNORE ---
-        return self._get_value(key_path, self.global_config, default=default)
+        value = self._cache.get(key_path, _MISSING)
+        if value is _MISSING:
+            # First check in local config, then in global config
+            value = self._get_value(key_path, self.config, default=None)
+            if value is None:
+                value = self._get_value(key_path, self.global_config, default=None)
+            self._cache[key_path] = value
+        return default if value is None else value
 
     def set(self, key_path: str, value, is_global=False):
         """
@@ -146,6 +151,7 @@ class WukongConfigManager:
                 if key not in current or not isinstance(current[key], dict):
                     current[key] = {}
                 current = current[key]
+        self._cache.clear()
         print(f"Set '{key_path}' to '{value}'.")
         self._is_loaded = True
 